@@ -1,3 +1,17 @@
-from redis.asyncio import Redis
+from os import getenv
 
-db: Redis = Redis(decode_responses=True)  # type: ignore[type-arg]
+from redis.asyncio import BlockingConnectionPool, Redis
+
+# use unix:///path/to/redis.sock when redis is running on the same host
+REDIS_URL: str = getenv("REDIS_URL", "redis://localhost:6379/0?socket_keepalive=1")
+REDIS_MAX_CONNECTIONS: int = 64
+REDIS_POOL_TIMEOUT: int = 20
+
+# shared by all handlers, waits for a free connection instead of failing
+redis_pool = BlockingConnectionPool.from_url(
+    REDIS_URL,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+    decode_responses=True,
+)
+db: Redis = Redis(connection_pool=redis_pool)  # type: ignore[type-arg]
@@ -1,7 +1,16 @@
 from socketio import ASGIApp, AsyncNamespace, AsyncServer  # type: ignore
 
 from app.twex.twex_sio import MainNamespace
+from siox.emitters import wait_background_emits
+from siox.managers import AsyncBroadcastManager
+from siox.serialization import PydanticCoreJSON
 
-sio = AsyncServer(async_mode="asgi")
+sio = AsyncServer(
+    async_mode="asgi",
+    async_handlers=True,  # each event runs in its own task, not blocking the reader
+    client_manager=AsyncBroadcastManager(),
+    json=PydanticCoreJSON,
+)
 sio.register_namespace(MainNamespace("/"))
-app = ASGIApp(socketio_server=sio)
+# pending notifications are delivered before the server stops
+app = ASGIApp(socketio_server=sio, on_shutdown=wait_background_emits)
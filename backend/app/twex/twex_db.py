@@ -1,12 +1,65 @@
 from enum import Enum
-from typing import Self
-from uuid import uuid4
+from itertools import count
+from os import urandom
+from typing import Any, Self
 
 from pydantic import BaseModel, Field, ValidationError
 
 from app.common.config import db
 from siox.exceptions import EventException
 
+# unfinished twexes are removed after this many seconds of inactivity
+TWEX_TTL: int = 3600
+
+# fields stored in the twex hash (all but `file_id`, which is the key itself)
+TWEX_DATA_FIELDS: tuple[str, ...] = ("status", "file_name")
+
+# Atomically checks the status & transfers it to ARGV[1] if it is one of ARGV[4:]
+# If ARGV[2] is "1", the twex is deleted instead, otherwise its TTL is reset to
+# ARGV[3] seconds. Returns TWEX_DATA_FIELDS of the twex as it was before
+# The field list is built from TWEX_DATA_FIELDS, so the result always matches it
+lua_data_fields = ", ".join(f'"{name}"' for name in TWEX_DATA_FIELDS)
+lua_status_index = TWEX_DATA_FIELDS.index("status") + 1  # lua tables are 1-based
+TRANSFER_STATUS_LUA = f"""
+local twex = redis.call("HMGET", KEYS[1], {lua_data_fields})
+for i = 4, #ARGV do
+    if twex[{lua_status_index}] == ARGV[i] then
+        if ARGV[2] == "1" then
+            redis.call("DEL", KEYS[1])
+        else
+            redis.call("HSET", KEYS[1], "status", ARGV[1])
+            redis.call("EXPIRE", KEYS[1], ARGV[3])
+        end
+        break
+    end
+end
+return twex
+"""
+transfer_status_script = db.register_script(TRANSFER_STATUS_LUA)
+
+
+def generate_id() -> str:
+    # same format as `uuid4().hex`, without building the UUID object
+    return urandom(16).hex()
+
+
+# chunk ids only need to be unique, random salt keeps them so across processes
+chunk_id_salt: str = urandom(8).hex()
+chunk_id_counter = count()
+
+
+def generate_chunk_id() -> str:
+    return f"{chunk_id_salt}{next(chunk_id_counter):x}"
+
+
+# the single source of the room name format, not cached: formatting is cheaper
+def publishers_room(file_id: str) -> str:
+    return f"{file_id}-publishers"
+
+
+def subscribers_room(file_id: str) -> str:
+    return f"{file_id}-subscribers"
+
 
 class TwexStatus(str, Enum):
     OPEN = "open"
@@ -17,23 +70,38 @@ class TwexStatus(str, Enum):
 
 
 class Twex(BaseModel):
-    file_id: str = Field(default_factory=lambda: uuid4().hex)
+    file_id: str = Field(default_factory=generate_id)
     file_name: str
     status: TwexStatus = TwexStatus.OPEN
 
     @classmethod
     async def find_one(cls, file_id: str) -> Self:
-        data = await db.hgetall(name=file_id)
+        values = await db.hmget(name=file_id, keys=TWEX_DATA_FIELDS)
+        data = {
+            name: value
+            for name, value in zip(TWEX_DATA_FIELDS, values)
+            if value is not None
+        }
         try:
             return cls(**data, file_id=file_id)
         except ValidationError:
             raise EventException(code=404, reason="Not found")
 
     @classmethod
-    async def find_with_status(cls, file_id: str, statuses: set[TwexStatus]) -> Self:
-        twex: Self = await cls.find_one(file_id)
+    async def find_and_transfer(
+        cls,
+        file_id: str,
+        statuses: frozenset[TwexStatus],
+        new_status: TwexStatus,
+    ) -> Self:
+        data = await cls.transfer_status_raw(file_id, statuses, new_status)
+        try:
+            twex = cls(**data, file_id=file_id)
+        except ValidationError:
+            raise EventException(code=404, reason="Not found")
         if twex.status not in statuses:
             raise EventException(code=400, reason=f"Wrong status: {twex.status.value}")
+        twex.status = new_status
         return twex
 
     async def update_status(self, new_status: TwexStatus) -> None:
@@ -41,24 +109,45 @@ class Twex(BaseModel):
         await db.hset(self.file_id, "status", new_status.value)
 
     @staticmethod
+    async def transfer_status_raw(
+        file_id: str,
+        statuses: frozenset[TwexStatus],
+        new_status: TwexStatus,
+    ) -> dict[str, Any]:
+        data: list[Any] = await transfer_status_script(
+            keys=[file_id],
+            args=[
+                new_status.value,
+                int(new_status is TwexStatus.FINISHED),
+                TWEX_TTL,
+                *(status.value for status in statuses),
+            ],
+        )
+        return {
+            name: value
+            for name, value in zip(TWEX_DATA_FIELDS, data)
+            if value is not None
+        }
+
+    @classmethod
     async def transfer_status(
+        cls,
         file_id: str,
-        statuses: set[TwexStatus],
+        statuses: frozenset[TwexStatus],
         new_status: TwexStatus,
     ) -> None:
-        twex_status = await db.hget(name=file_id, key="status")
+        data = await cls.transfer_status_raw(file_id, statuses, new_status)
+        twex_status = data.get("status")
         if twex_status is None:
             raise EventException(code=404, reason="Not found")
         if twex_status not in statuses:
             raise EventException(code=400, reason=f"Wrong status: {twex_status}")
 
-        if new_status is TwexStatus.FINISHED:
-            await db.delete(file_id)
-        else:
-            await db.hset(file_id, "status", new_status.value)
-
     async def save(self) -> None:
-        await db.hset(
-            name=self.file_id,
-            mapping=self.model_dump(exclude="file_id"),  # type: ignore[arg-type]
-        )
+        async with db.pipeline(transaction=True) as pipeline:
+            pipeline.hset(
+                name=self.file_id,
+                mapping=self.model_dump(exclude="file_id"),  # type: ignore[arg-type]
+            )
+            pipeline.expire(self.file_id, TWEX_TTL)
+            await pipeline.execute()
@@ -3,38 +3,65 @@ from __future__ import annotations
 import logging
 from collections.abc import Awaitable, Callable
 from typing import Annotated, Any
-from uuid import uuid4
 
 from pydantic import BaseModel
 from socketio import AsyncNamespace  # type: ignore
 
 from app.common.sockets import AckPacker, NoContentPacker
-from app.twex.twex_db import Twex, TwexStatus
+from app.twex.twex_db import (
+    Twex,
+    TwexStatus,
+    generate_chunk_id,
+    publishers_room,
+    subscribers_room,
+)
 from siox.emitters import DuplexEmitter
 from siox.markers import Depends, Sid
+from siox.packagers import PydanticPackager
 from siox.parsers import RequestSignatureParser
 from siox.request import RequestData
+from siox.results import ClientHandler
 from siox.socket import AsyncSocket
 from siox.types import DataOrTuple
 
+SUBSCRIBE_STATUSES = frozenset({TwexStatus.OPEN})
+SEND_STATUSES = frozenset({TwexStatus.FULL, TwexStatus.CONFIRMED})
+CONFIRM_STATUSES = frozenset({TwexStatus.SENT})
+FINISH_STATUSES = frozenset({TwexStatus.CONFIRMED})
+
+
+def twex_transferred(
+    statuses: frozenset[TwexStatus],
+    new_status: TwexStatus,
+) -> Callable[..., Awaitable[Twex]]:
+    async def twex_transferred_inner(file_id: str) -> Twex:
+        return await Twex.find_and_transfer(
+            file_id=file_id,
+            statuses=statuses,
+            new_status=new_status,
+        )
 
-def twex_with_status(statuses: set[TwexStatus]) -> Callable[..., Awaitable[Twex]]:
-    async def twex_with_status_inner(file_id: str) -> Twex:
-        return await Twex.find_with_status(file_id=file_id, statuses=statuses)
-
-    return twex_with_status_inner
+    return twex_transferred_inner
 
 
 class MainNamespace(AsyncNamespace):  # type: ignore
+    def __init__(self, namespace: str | None = None) -> None:
+        super().__init__(namespace)
+        # all handlers are parsed once, when the namespace is created
+        self.client_handlers: dict[str, ClientHandler] = {
+            handler_name.removeprefix("on_"): RequestSignatureParser(
+                getattr(self, handler_name), ns=type(self)
+            ).extract()
+            for handler_name in dir(type(self))
+            if handler_name.startswith("on_")
+        }
+
     async def trigger_event(self, event: str, *args: Any) -> DataOrTuple:
-        handler_name = f"on_{event}"
-        handler = getattr(self, handler_name, None)
-        if handler is None:
+        client_handler = self.client_handlers.get(event)
+        if client_handler is None:
             return None
 
-        request = RequestSignatureParser(handler, ns=type(self))
-        client_event = request.extract()
-        result = await client_event.handle(RequestData(self, event, *args))
+        result = await client_handler.handle(RequestData(self, event, *args))
         if isinstance(result, BaseModel):
             return result.model_dump()
         return result
@@ -53,12 +80,13 @@ class MainNamespace(AsyncNamespace):  # type: ignore
         args: CreateArgs,
         /,
         socket: AsyncSocket,
-    ) -> Annotated[dict[str, Any], AckPacker(FileIdArgs, code=201)]:
+    ) -> Annotated[FileIdArgs, AckPacker(FileIdArgs, code=201)]:
         twex = Twex(file_name=args.file_name)
         await twex.save()
 
-        socket.enter_room(f"{twex.file_id}-publishers")
-        return {"file_id": twex.file_id}
+        socket.enter_room(publishers_room(twex.file_id))
+        # responses are built from trusted values, so they skip validation
+        return self.FileIdArgs.model_construct(file_id=twex.file_id)
 
     class SubscribeArgs(BaseModel):
         pass
@@ -71,21 +99,25 @@ class MainNamespace(AsyncNamespace):  # type: ignore
         args: SubscribeArgs,
         /,
         socket: AsyncSocket,
-        twex: Annotated[Twex, Depends(twex_with_status({TwexStatus.OPEN}))],
+        twex: Annotated[
+            Twex, Depends(twex_transferred(SUBSCRIBE_STATUSES, TwexStatus.FULL))
+        ],
         event: Annotated[DuplexEmitter, SubscribeResp],
-    ) -> Annotated[Twex, AckPacker(SubscribeResp)]:
+    ) -> Annotated[SubscribeResp, AckPacker(SubscribeResp)]:
         if args:
             pass
 
-        await twex.update_status(new_status=TwexStatus.FULL)
         # TODO more control over FULL for non-dialog twexes
 
-        socket.enter_room(f"{twex.file_id}-subscribers")
-        await event.emit(data=twex, target=f"{twex.file_id}-publishers")
-        return twex
+        socket.enter_room(subscribers_room(twex.file_id))
+        response = self.SubscribeResp.model_construct(
+            file_id=twex.file_id, file_name=twex.file_name
+        )
+        event.emit_nowait(data=response, target=publishers_room(twex.file_id))
+        return response
 
     class SendArgs(FileIdArgs):
-        chunk: str
+        chunk: str | bytes  # bytes are sent as binary attachments, without base64
 
     class SendAck(BaseModel):
         chunk_id: str
@@ -97,20 +129,22 @@ class MainNamespace(AsyncNamespace):  # type: ignore
         self,
         args: SendArgs,
         /,
-        event: Annotated[DuplexEmitter, SendResp],
-    ) -> Annotated[dict[str, Any], AckPacker(SendAck)]:
+        event: Annotated[DuplexEmitter, PydanticPackager(SendResp, mode="python")],
+    ) -> Annotated[SendAck, AckPacker(SendAck)]:
         await Twex.transfer_status(
             file_id=args.file_id,
-            statuses={TwexStatus.FULL, TwexStatus.CONFIRMED},
+            statuses=SEND_STATUSES,
             new_status=TwexStatus.SENT,
         )
 
-        chunk_id: str = uuid4().hex
-        await event.emit(
-            data={"chunk_id": chunk_id, **args.model_dump()},
-            target=f"{args.file_id}-subscribers",
+        chunk_id: str = generate_chunk_id()
+        event.emit_nowait(
+            data=self.SendResp.model_construct(
+                chunk_id=chunk_id, file_id=args.file_id, chunk=args.chunk
+            ),
+            target=subscribers_room(args.file_id),
         )
-        return {"chunk_id": chunk_id}
+        return self.SendAck.model_construct(chunk_id=chunk_id)
 
     class ConfirmArgs(FileIdArgs):
         chunk_id: str
@@ -123,10 +157,10 @@ class MainNamespace(AsyncNamespace):  # type: ignore
     ) -> Annotated[None, NoContentPacker()]:
         await Twex.transfer_status(
             file_id=args.file_id,
-            statuses={TwexStatus.SENT},
+            statuses=CONFIRM_STATUSES,
             new_status=TwexStatus.CONFIRMED,
         )
-        await event.emit(data=args, target=f"{args.file_id}-publishers")
+        event.emit_nowait(data=args, target=publishers_room(args.file_id))
 
     class FinishArgs(FileIdArgs):
         pass
@@ -139,7 +173,7 @@ class MainNamespace(AsyncNamespace):  # type: ignore
     ) -> Annotated[None, NoContentPacker()]:
         await Twex.transfer_status(
             file_id=args.file_id,
-            statuses={TwexStatus.CONFIRMED},
+            statuses=FINISH_STATUSES,
             new_status=TwexStatus.FINISHED,
         )
-        await event.emit(data=args, target=f"{args.file_id}-subscribers")
+        event.emit_nowait(data=args, target=subscribers_room(args.file_id))
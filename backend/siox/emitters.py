@@ -1,11 +1,28 @@
+import logging
+from asyncio import Task, create_task, gather
 from typing import Any, ClassVar
 
 from siox.packagers import Packager
 from siox.socket import AsyncSocket
 from siox.types import CallbackProtocol
 
+background_emits: set[Task[None]] = set()
+
+
+def finalize_background_emit(task: Task[None]) -> None:
+    background_emits.discard(task)
+    if not task.cancelled() and (exception := task.exception()) is not None:
+        logging.error("Background emit failed", exc_info=exception)
+
+
+async def wait_background_emits() -> None:
+    while background_emits:
+        await gather(*background_emits, return_exceptions=True)
+
 
 class ServerEmitter:
+    __slots__ = ("socket", "packager", "name")
+
     default_exclude_self: ClassVar[bool] = False
 
     def __init__(
@@ -30,6 +47,13 @@ class ServerEmitter:
     ) -> None:
         if exclude_self is None:
             exclude_self = self.default_exclude_self
+        if not self.socket.has_participants(
+            target=target,
+            skip_sid=skip_sid,
+            exclude_self=exclude_self,
+            namespace=namespace,
+        ):
+            return  # no need to pack data if nobody is going to receive it
         await self.socket.emit(
             event=self.name,
             data=self.packager.pack(data),
@@ -41,6 +65,33 @@ class ServerEmitter:
             ignore_queue=ignore_queue,
         )
 
+    def emit_nowait(
+        self,
+        data: Any,
+        target: str | None = None,
+        skip_sid: str | None = None,
+        exclude_self: bool | None = None,
+        namespace: str | None = None,
+        callback: CallbackProtocol | None = None,
+        ignore_queue: bool = False,
+    ) -> None:
+        # runs `emit` as a background task, so the caller doesn't wait for fanout
+        task = create_task(
+            self.emit(
+                data=data,
+                target=target,
+                skip_sid=skip_sid,
+                exclude_self=exclude_self,
+                namespace=namespace,
+                callback=callback,
+                ignore_queue=ignore_queue,
+            )
+        )
+        background_emits.add(task)
+        task.add_done_callback(finalize_background_emit)
+
 
 class DuplexEmitter(ServerEmitter):
+    __slots__ = ()
+
     default_exclude_self: ClassVar[bool] = True
@@ -0,0 +1,64 @@
+from asyncio import sleep
+from typing import Any, ClassVar
+
+from socketio import AsyncManager, packet  # type: ignore[import]
+
+from siox.types import CallbackProtocol
+
+
+class AsyncBroadcastManager(AsyncManager):  # type: ignore[misc]
+    # big rooms yield to the event loop every so often to not starve other events
+    batch_size: ClassVar[int] = 50
+
+    async def emit(
+        self,
+        event: str,
+        data: Any,
+        namespace: str,
+        room: str | None = None,
+        skip_sid: str | list[str] | None = None,
+        callback: CallbackProtocol | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if callback is not None:  # ack ids are different for every participant
+            await super().emit(
+                event, data, namespace, room, skip_sid, callback, **kwargs
+            )
+            return
+        if namespace not in self.rooms:
+            return
+        skip_sids: set[str | None]
+        skip_sids = set(skip_sid) if isinstance(skip_sid, list) else {skip_sid}
+
+        # same conversion as in `AsyncServer._emit_internal`
+        if isinstance(data, tuple):
+            data = list(data)
+        elif data is not None:
+            data = [data]
+        else:
+            data = []
+
+        # the packet is encoded once and reused for every participant
+        encoded: str | list[str | bytes] | None = None
+        sent_count = 0
+        for sid, eio_sid in self.get_participants(namespace, room):
+            if sid in skip_sids:
+                continue
+            if sent_count and sent_count % self.batch_size == 0:
+                await sleep(0)
+            if encoded is None:
+                encoded = self.server.packet_class(
+                    packet.EVENT, namespace=namespace, data=[event, *data]
+                ).encode()
+            await self._send_encoded(eio_sid, encoded)
+            sent_count += 1
+
+    async def _send_encoded(
+        self, eio_sid: str, encoded: str | list[str | bytes]
+    ) -> None:
+        # same as `AsyncServer._send_packet`, but for an already encoded packet
+        if isinstance(encoded, list):
+            for frame in encoded:
+                await self.server.eio.send(eio_sid, frame)
+        else:
+            await self.server.eio.send(eio_sid, encoded)
@@ -11,6 +11,8 @@ T = TypeVar("T")
 
 
 class Depends:
+    __slots__ = ("dependency",)
+
     def __init__(self, dependency: AnyCallable) -> None:
         self.dependency = dependency
 
@@ -1,4 +1,4 @@
-from typing import Any, cast
+from typing import Any, Literal, cast
 
 from pydantic import BaseModel
 
@@ -25,11 +25,20 @@ class NoopPackager(CastedPackager):
 
 
 class PydanticPackager(CastedPackager):
-    def __init__(self, model: type[BaseModel]) -> None:
+    def __init__(
+        self,
+        model: type[BaseModel],
+        mode: Literal["json", "python"] = "json",
+    ) -> None:
         self.model = model
+        self.mode = mode
+        self.validate = model.__pydantic_validator__.validate_python
+        self.serialize = model.__pydantic_serializer__.to_python
 
     def pack_to_any(self, data: Any) -> Any:
-        return self.model.model_validate(data).model_dump(mode="json")
+        if type(data) is not self.model:  # instances of the model are already valid
+            data = self.validate(data)
+        return self.serialize(data, mode=self.mode)
 
 
 class ErrorPackager(Packager):
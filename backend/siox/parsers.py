@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from collections.abc import Awaitable, Callable, Iterator
-from inspect import Parameter, Signature, signature
-from typing import Annotated, Any, TypeVar, get_args, get_origin
+from dataclasses import dataclass, field
+from inspect import Parameter, Signature, isfunction, ismethod, signature
+from typing import Annotated, Any, TypeVar, get_args, get_origin, get_type_hints
 
-from pydantic import BaseModel, create_model
+from pydantic import BaseModel, TypeAdapter, create_model
 from pydantic._internal._typing_extra import eval_type_lenient
 
 from siox.emitters import DuplexEmitter, ServerEmitter
@@ -59,14 +60,19 @@ class ExpandablePydanticModel:
     def extract(self) -> ExpandedArgument:
         return ExpandedArgument(
             base=self.base,
-            destinations=self.destinations,
+            destinations=tuple(
+                (name, destination)
+                for name, destinations in self.destinations.items()
+                for destination in destinations
+            ),
         )
 
 
-class SPContext(BaseModel, arbitrary_types_allowed=True):
-    arg_types: list[type | ExpandablePydanticModel] = []
+@dataclass(slots=True)
+class SPContext:
+    arg_types: list[type | ExpandablePydanticModel] = field(default_factory=list)
     first_expandable_argument: ExpandablePydanticModel | None = None
-    signatures: dict[AnyCallable, SignatureParser] = {}
+    signatures: dict[AnyCallable, SignatureParser] = field(default_factory=dict)
 
 
 class SignatureParser:
@@ -81,11 +87,33 @@ class SignatureParser:
         self.func = func
         self.signature: Signature = signature(func)
         self.local_ns: LocalNS = local_ns or {}
+        self.type_hints: dict[str, Any] = self.resolve_type_hints()
         self.runnable: Runnable = runnable or Runnable(func)
         self.context: SPContext = context
         self.marker_destinations = marker_destinations
         self.unresolved: set[AnyCallable] = set()
 
+    def resolve_type_hints(self) -> dict[str, Any]:
+        if isfunction(self.func) or ismethod(self.func):
+            try:  # all annotations are resolved in one go, instead of one by one
+                return get_type_hints(
+                    self.func, localns=self.local_ns, include_extras=True
+                )
+            except NameError:
+                pass  # unknown forward references are resolved leniently below
+
+        # partials, callable instances, etc. are not supported by `get_type_hints`
+        global_ns = getattr(self.func, "__globals__", {})
+        annotations: dict[str, Any] = {
+            name: param.annotation for name, param in self.signature.parameters.items()
+        }
+        annotations["return"] = self.signature.return_annotation
+        return {
+            name: eval_type_lenient(annotation, global_ns, self.local_ns)
+            for name, annotation in annotations.items()
+            if isinstance(annotation, str)
+        }
+
     def parse_positional_only(self, param: Parameter, ann: Any) -> None:
         raise NotImplementedError
 
@@ -118,15 +146,14 @@ class SignatureParser:
                     self.marker_destinations,
                     self.local_ns,
                 )
-                dependency_signature.parse()
+                # registered before parsing, so cycles are found instead of recursing
                 self.context.signatures[decoded.dependency] = dependency_signature
+                dependency_signature.parse()
             elif not isinstance(dependency_signature, DependencySignatureParser):
                 raise Exception(
                     f"Can't add destination to {type(dependency_signature)}"
                 )  # TODO errors
-            dependency_signature.dependency.destinations.setdefault(
-                self.runnable, []
-            ).append(param.name)
+            dependency_signature.add_destination(param.name, self.runnable)
             self.unresolved.add(decoded.dependency)
         elif isinstance(decoded, Marker):
             self.marker_destinations.add_destination(decoded, self.runnable, param.name)
@@ -176,11 +203,7 @@ class SignatureParser:
 
     def parse(self) -> None:
         for param in self.signature.parameters.values():
-            annotation: Any = param.annotation
-            if isinstance(annotation, str):
-                global_ns = getattr(self.func, "__globals__", {})
-                annotation = eval_type_lenient(annotation, global_ns, self.local_ns)
-
+            annotation: Any = self.type_hints.get(param.name, param.annotation)
             if param.kind == param.POSITIONAL_ONLY:
                 self.parse_positional_only(param, annotation)
             elif isinstance(annotation, type):
@@ -204,6 +227,10 @@ class DependencySignatureParser(SignatureParser):
             func, context, marker_destinations, local_ns, runnable=self.dependency
         )
 
+    def add_destination(self, name: str, destination: Runnable) -> None:
+        # same (field, runnable) order as `ExpandablePydanticModel.extract`
+        self.dependency.destinations += ((name, destination),)
+
     def parse_positional_only(self, param: Parameter, ann: Any) -> None:
         raise Exception("No positional args allowed for dependencies")  # TODO errors
 
@@ -234,29 +261,41 @@ class RequestSignatureParser(SignatureParser):
             else:  # TODO remove the isinstance check
                 yield arg_type
 
-    def resolve_dependencies(self) -> Iterator[Dependency]:
-        layer: list[SignatureParser]
-        while len(self.unresolved) != 0:  # TODO errors for cycles in DR
-            layer = [
-                dependency
-                for dependency in self.context.signatures.values()
-                if len(dependency.unresolved) == 0
-            ]
-            yield from (
-                dependency.dependency
-                for dependency in layer
-                if isinstance(dependency, DependencySignatureParser)
-            )
-            for signature in self.context.signatures.values():
-                for resolved in layer:
-                    signature.unresolved.discard(resolved.func)
+    def resolve_dependencies(self) -> Iterator[list[Dependency]]:
+        # Kahn's algorithm over the reversed graph (dependency -> dependents)
+        # yields layers, dependencies in one layer don't depend on each other
+        dependents: dict[AnyCallable, list[AnyCallable]] = {}
+        in_degrees: dict[AnyCallable, int] = {}
+        for func, signature in self.context.signatures.items():
+            in_degrees[func] = len(signature.unresolved)
+            for dependency in signature.unresolved:
+                dependents.setdefault(dependency, []).append(func)
+
+        ready = [func for func, in_degree in in_degrees.items() if in_degree == 0]
+        while len(ready) != 0:
+            layer: list[Dependency] = []
+            next_ready: list[AnyCallable] = []
+            for func in ready:
+                signature = self.context.signatures[func]
+                if isinstance(signature, DependencySignatureParser):
+                    layer.append(signature.dependency)
+                for dependent in dependents.get(func, []):
+                    in_degrees[dependent] -= 1
+                    if in_degrees[dependent] == 0:
+                        next_ready.append(dependent)
+            if len(layer) != 0:
+                yield layer
+            ready = next_ready
+
+        if any(in_degree != 0 for in_degree in in_degrees.values()):
+            raise Exception("Dependencies can't be cyclic")  # TODO errors
 
     def parse(self) -> None:
         super().parse()
-        annotation: Any = self.signature.return_annotation  # TODO type the annotation
-        if isinstance(annotation, str):
-            global_ns = getattr(self.func, "__globals__", {})
-            annotation = eval_type_lenient(annotation, global_ns, self.local_ns)
+        # TODO type the annotation
+        annotation: Any = self.type_hints.get(
+            "return", self.signature.return_annotation
+        )
 
         if get_origin(annotation) is Annotated:
             args = get_args(annotation)
@@ -267,12 +306,8 @@ class RequestSignatureParser(SignatureParser):
         self.parse()
         return ClientHandler(
             marker_destinations=self.marker_destinations,
-            arg_model=create_model(  # type: ignore[call-overload]
-                "InputModel",  # TODO model name from event & namespace(?)
-                **{
-                    str(i): (ann, ...)
-                    for i, ann in enumerate(self.generate_positional_fields())
-                },
+            arg_adapter=TypeAdapter(
+                tuple.__class_getitem__(tuple(self.generate_positional_fields()))
             ),
             arg_types=[
                 argument_type.extract()
@@ -281,7 +316,7 @@ class RequestSignatureParser(SignatureParser):
                 for argument_type in self.context.arg_types
             ],
             arg_count=len(self.context.arg_types),
-            dependency_order=list(self.resolve_dependencies()),
+            dependency_layers=list(self.resolve_dependencies()),
             runnable=self.runnable,
             result_packager=self.result_packager or NoopPackager(),
             error_packager=BasicErrorPackager(),
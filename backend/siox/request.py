@@ -4,6 +4,8 @@ from siox.socket import AsyncServer, AsyncSocket
 
 
 class RequestData:
+    __slots__ = ("socket", "event_name", "sid", "arguments")
+
     def __init__(
         self,
         server: AsyncServer,
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from asyncio import gather
 from collections.abc import Awaitable, Callable, Iterator
-from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    contextmanager,
+)
 from inspect import isasyncgenfunction, iscoroutinefunction, isgeneratorfunction
 from typing import Any, TypeVar
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from siox.exceptions import EventException
 from siox.markers import Marker
@@ -15,55 +22,75 @@ from siox.types import DataOrTuple
 
 T = TypeVar("T")
 
+# per-call keyword arguments of every runnable, indexed by `Runnable.index`
+RunnableKwargs = list[dict[str, Any]]
+
 
 class ExpandedArgument:
+    __slots__ = ("base", "destinations", "base_field_names")
+
     def __init__(
-        self, base: type[BaseModel], destinations: dict[str, list[Runnable]]
+        self, base: type[BaseModel], destinations: tuple[tuple[str, Runnable], ...]
     ) -> None:
         self.base = base
         self.destinations = destinations
+        self.base_field_names: tuple[str, ...] = tuple(base.model_fields)
 
     def clean(self, result: BaseModel) -> BaseModel:
-        return self.base.model_validate(
-            result.model_dump(include=set(self.base.model_fields.keys()))
+        # values were already validated by the expanded model, no need to repeat
+        values = result.__dict__
+        return self.base.model_construct(
+            **{name: values[name] for name in self.base_field_names}
         )
 
-    def fulfill_destinations(self, result: BaseModel) -> None:
-        for field_name, destinations in self.destinations.items():
-            value = getattr(result, field_name)
-            for destination in destinations:
-                destination.kwargs[field_name] = value
+    def fulfill_destinations(self, result: BaseModel, kwargs: RunnableKwargs) -> None:
+        values = result.__dict__
+        for field_name, destination in self.destinations:
+            kwargs[destination.index][field_name] = values[field_name]
 
 
 class Runnable:
+    __slots__ = ("func", "is_coroutine", "index")
+
     def __init__(self, func: Callable[..., T | Awaitable[T]]) -> None:
+        if not callable(func):
+            raise Exception("Handler is not callable")
         self.func = func
-        self.args: tuple[Any, ...] = ()
-        self.kwargs: dict[str, Any] = {}
+        self.is_coroutine = iscoroutinefunction(func)
+        self.index = 0  # position in the handler's kwargs, set by `ClientHandler`
 
-    async def run(self) -> T:
-        if iscoroutinefunction(self.func):
-            return await self.func(*self.args, **self.kwargs)  # type: ignore[no-any-return]
-        elif callable(self.func):
-            return self.func(*self.args, **self.kwargs)  # type: ignore[return-value]
-        raise Exception("Handler is not callable")
+    async def run(self, *args: Any, **kwargs: Any) -> T:
+        if self.is_coroutine:
+            return await self.func(*args, **kwargs)  # type: ignore[misc, no-any-return]
+        return self.func(*args, **kwargs)  # type: ignore[return-value]
 
 
 class Dependency(Runnable):
+    __slots__ = ("destinations", "async_context", "sync_context")
+
     def __init__(self, func: Callable[..., T | Awaitable[T]]) -> None:
         super().__init__(func)
-        self.destinations: dict[Runnable, list[str]] = {}
+        # flat (field, runnable) pairs, filled by `DependencySignatureParser`
+        self.destinations: tuple[tuple[str, Runnable], ...] = ()
 
-    async def resolve(self, stack: AsyncExitStack) -> Any:
-        if isasyncgenfunction(self.func):
-            return await stack.enter_async_context(
-                asynccontextmanager(self.func)(*self.args, **self.kwargs)
-            )
-        elif isgeneratorfunction(self.func):
-            return stack.enter_context(
-                contextmanager(self.func)(*self.args, **self.kwargs)
-            )
-        return await self.run()
+        # generator dependencies are wrapped once, not on every resolve
+        self.async_context: Callable[..., AbstractAsyncContextManager[Any]] | None = (
+            asynccontextmanager(func) if isasyncgenfunction(func) else None
+        )
+        self.sync_context: Callable[..., AbstractContextManager[Any]] | None = (
+            contextmanager(func) if isgeneratorfunction(func) else None
+        )
+
+    @property
+    def needs_stack(self) -> bool:
+        return self.async_context is not None or self.sync_context is not None
+
+    async def resolve(self, stack: AsyncExitStack, kwargs: dict[str, Any]) -> Any:
+        if self.async_context is not None:
+            return await stack.enter_async_context(self.async_context(**kwargs))
+        elif self.sync_context is not None:
+            return stack.enter_context(self.sync_context(**kwargs))
+        return await self.run(**kwargs)
 
 
 class MarkerDestinations:
@@ -79,46 +106,112 @@ class MarkerDestinations:
         destinations = self.destinations.setdefault(marker, [])
         destinations.append((destination, field_name))
 
-    def fill_all(self, request: RequestData) -> None:
+    def fill_all(self, request: RequestData, kwargs: RunnableKwargs) -> None:
         for marker, destinations in self.destinations.items():
             value: Any = marker.extract(request)
             for destination, field_name in destinations:
-                destination.kwargs[field_name] = value
+                kwargs[destination.index][field_name] = value
 
 
 class ClientHandler:
     def __init__(
         self,
         marker_destinations: MarkerDestinations,
-        arg_model: type[BaseModel],
+        arg_adapter: TypeAdapter[tuple[Any, ...]],
         arg_types: list[type | ExpandedArgument],
         arg_count: int,
-        dependency_order: list[Dependency],
+        dependency_layers: list[list[Dependency]],
         runnable: Runnable,
         result_packager: Packager,
         error_packager: ErrorPackager,
     ):
         self.marker_destinations = marker_destinations
-        self.arg_model = arg_model
+        self.arg_adapter = arg_adapter
+        self.validate_arguments = arg_adapter.validate_python
         self.arg_types = arg_types
+        # arguments that are passed through as-is are marked with None
+        self.arg_plan: tuple[ExpandedArgument | None, ...] = tuple(
+            arg_type if isinstance(arg_type, ExpandedArgument) else None
+            for arg_type in arg_types
+        )
         self.arg_count = arg_count
-        self.dependency_order = dependency_order
+        self.dependency_layers = dependency_layers
+        # only coroutine dependencies of a layer run concurrently, in child tasks
+        # sync & generator ones stay in the handler's task, which unwinds the stack
+        self.layer_plan: tuple[tuple[list[Dependency], list[Dependency]], ...] = tuple(
+            (
+                [dep for dep in layer if not dep.is_coroutine],
+                [dep for dep in layer if dep.is_coroutine],
+            )
+            for layer in dependency_layers
+        )
+        dependency_order = [dep for layer in dependency_layers for dep in layer]
+        self.needs_stack = any(
+            dependency.needs_stack for dependency in dependency_order
+        )
         self.runnable = runnable
+        self.runnable_count = len(dependency_order) + 1
+        for index, dependency in enumerate(dependency_order):
+            dependency.index = index
+        runnable.index = len(dependency_order)
         self.result_packager = result_packager
         self.error_packager = error_packager
 
-    def parse_arguments(self, arguments: tuple[Any, ...]) -> Iterator[Any]:
-        converted = self.arg_model.model_validate(
-            {str(i): ann for i, ann in enumerate(arguments)}
-        )
-        for i, arg_type in enumerate(self.arg_types):
-            result: Any = getattr(converted, str(i))
-            # TODO remove instance check & properly support non-pydantic arguments
-            if isinstance(arg_type, ExpandedArgument):
-                yield arg_type.clean(result)
-                arg_type.fulfill_destinations(result)
-            else:
+    def parse_arguments(
+        self, converted: tuple[Any, ...], kwargs: RunnableKwargs
+    ) -> Iterator[Any]:
+        for expanded_argument, result in zip(self.arg_plan, converted):
+            # TODO properly support non-pydantic arguments
+            if expanded_argument is None:
                 yield result
+            else:
+                yield expanded_argument.clean(result)
+                expanded_argument.fulfill_destinations(result, kwargs)
+
+    async def resolve_dependency(
+        self,
+        dependency: Dependency,
+        kwargs: RunnableKwargs,
+        stack: AsyncExitStack | None,
+    ) -> None:
+        value: Any
+        if dependency.is_coroutine:  # the common case, called directly
+            value = await dependency.func(**kwargs[dependency.index])  # type: ignore[misc]
+        elif stack is None:  # no generator dependencies, see `needs_stack`
+            value = dependency.func(**kwargs[dependency.index])
+        else:
+            value = await dependency.resolve(stack, kwargs[dependency.index])
+        for field_name, destination in dependency.destinations:
+            kwargs[destination.index][field_name] = value
+
+    async def execute(
+        self,
+        args: tuple[Any, ...],
+        kwargs: RunnableKwargs,
+        stack: AsyncExitStack | None,
+    ) -> DataOrTuple:
+        for sequential, concurrent in self.layer_plan:
+            for dependency in sequential:
+                await self.resolve_dependency(dependency, kwargs, stack)
+            if len(concurrent) < 2:
+                for dependency in concurrent:
+                    await self.resolve_dependency(dependency, kwargs, stack)
+                continue
+
+            # dependencies of one layer are independent, so they run concurrently
+            # all of them are awaited before raising, to not leave any running
+            results = await gather(
+                *(self.resolve_dependency(dep, kwargs, stack) for dep in concurrent),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+        # call the function
+        return self.result_packager.pack(
+            await self.runnable.run(*args, **kwargs[self.runnable.index])
+        )
 
     async def handle(self, request: RequestData) -> DataOrTuple:
         if len(request.arguments) != self.arg_count:
@@ -130,23 +223,23 @@ class ClientHandler:
                 )
             )
 
-        try:
-            self.runnable.args = tuple(self.parse_arguments(request.arguments))
-        except (ValidationError, AttributeError) as e:
-            return self.error_packager.pack_error(EventException(422, str(e)))
+        kwargs: RunnableKwargs = [{} for _ in range(self.runnable_count)]
+
+        args: tuple[Any, ...] = ()
+        if self.arg_count != 0:  # nothing to validate otherwise
+            try:
+                converted = self.validate_arguments(request.arguments)
+            except ValidationError as e:
+                return self.error_packager.pack_error(EventException(422, str(e)))
+            args = tuple(self.parse_arguments(converted, kwargs))
 
-        self.marker_destinations.fill_all(request)
+        self.marker_destinations.fill_all(request, kwargs)
 
         try:
+            if not self.needs_stack:
+                return await self.execute(args, kwargs, stack=None)
             async with AsyncExitStack() as stack:
-                for dependency in self.dependency_order:
-                    value = await dependency.resolve(stack)
-                    for destination, field_names in dependency.destinations.items():
-                        for field_name in field_names:
-                            destination.kwargs[field_name] = value
-
-                # call the function
-                return self.result_packager.pack(await self.runnable.run())
+                return await self.execute(args, kwargs, stack=stack)
             # this code is, in fact, reachable
             # noinspection PyUnreachableCode
             return None  # TODO `with` above can lead to no return
@@ -0,0 +1,18 @@
+import json
+from typing import Any
+
+from pydantic_core import to_json
+
+
+class PydanticCoreJSON:
+    # drop-in for the `json` module of socketio & engineio:
+    # pydantic-core's encoder is much faster than the stdlib one
+    # and always produces compact output, so `separators` & co. are ignored
+
+    @staticmethod
+    def dumps(obj: Any, **_: Any) -> str:
+        return to_json(obj).decode("utf-8")
+
+    @staticmethod
+    def loads(s: str | bytes, **kwargs: Any) -> Any:
+        return json.loads(s, **kwargs)
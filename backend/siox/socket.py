@@ -1,11 +1,14 @@
 from typing import Any, AsyncContextManager, Literal, cast
 
 import socketio  # type: ignore[import]
+from socketio.asyncio_pubsub_manager import AsyncPubSubManager  # type: ignore[import]
 
 from siox.types import CallbackProtocol, DataOrTuple, DataType
 
 
 class AsyncServer:
+    __slots__ = ("backend",)
+
     def __init__(self, backend: socketio.AsyncServer | socketio.AsyncNamespace) -> None:
         self.backend = backend
 
@@ -29,6 +32,29 @@ class AsyncServer:
             ignore_queue=ignore_queue,
         )
 
+    def has_participants(
+        self,
+        target: str | None = None,
+        skip_sid: str | None = None,
+        namespace: str | None = None,
+    ) -> bool:
+        if isinstance(self.backend, socketio.AsyncNamespace):
+            server = self.backend.server
+            namespace = namespace or self.backend.namespace
+        else:
+            server = self.backend
+            namespace = namespace or "/"
+
+        manager = server.manager
+        if isinstance(manager, AsyncPubSubManager):
+            return True  # participants on other nodes are not known here
+        # direct lookup, `get_participants` copies the whole room
+        participants = manager.rooms.get(namespace, {}).get(target)
+        if not participants:
+            return False
+        # skip_sid can only exclude one participant
+        return len(participants) > 1 or skip_sid not in participants
+
     async def send(
         self,
         data: DataOrTuple,
@@ -125,6 +151,8 @@ class AsyncServer:
 
 
 class AsyncSocket:
+    __slots__ = ("server", "backend", "sid")
+
     def __init__(
         self,
         backend: socketio.AsyncServer | socketio.AsyncNamespace,
@@ -155,6 +183,19 @@ class AsyncSocket:
             ignore_queue=ignore_queue,
         )
 
+    def has_participants(
+        self,
+        target: str | None = None,
+        skip_sid: str | None = None,
+        exclude_self: bool | None = None,
+        namespace: str | None = None,
+    ) -> bool:
+        return self.server.has_participants(
+            target=target,
+            skip_sid=skip_sid or self.sid if exclude_self else None,
+            namespace=namespace,
+        )
+
     async def send(
         self,
         data: DataOrTuple,
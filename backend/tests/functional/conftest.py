@@ -4,7 +4,7 @@ import pytest
 from faker import Faker
 
 from app.main import sio
-from app.twex.twex_db import Twex
+from app.twex.twex_db import Twex, publishers_room, subscribers_room
 from tests.testing import AsyncSIOTestClient
 
 
@@ -20,7 +20,7 @@ async def roomed_sender(
     sender: AsyncSIOTestClient,
     source_twex: Twex,
 ) -> AsyncSIOTestClient:
-    sio.enter_room(sender.sid, f"{source_twex.file_id}-publishers")
+    sio.enter_room(sender.sid, publishers_room(source_twex.file_id))
     return sender
 
 
@@ -29,7 +29,7 @@ async def roomed_receiver(
     receiver: AsyncSIOTestClient,
     source_twex: Twex,
 ) -> AsyncSIOTestClient:
-    sio.enter_room(receiver.sid, f"{source_twex.file_id}-subscribers")
+    sio.enter_room(receiver.sid, subscribers_room(source_twex.file_id))
     return receiver
 
 
@@ -1,6 +1,7 @@
 import pytest
 
-from app.twex.twex_db import Twex, TwexStatus
+from app.common.config import db
+from app.twex.twex_db import TWEX_TTL, Twex, TwexStatus
 from tests.testing import AsyncSIOTestClient
 
 
@@ -18,6 +19,7 @@ async def test_successful_create(
     assert twex.file_id == file_id
     assert twex.file_name == file_name
     assert twex.status == TwexStatus.OPEN
+    assert 0 < await db.ttl(file_id) <= TWEX_TTL
 
     assert sender.event_count() == 0
     assert receiver.event_count() == 0
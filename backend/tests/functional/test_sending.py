@@ -1,8 +1,11 @@
 from typing import Any
+from unittest.mock import patch
 
 import pytest
+from faker import Faker
 
 from app.twex.twex_db import Twex, TwexStatus
+from siox.packagers import PydanticPackager
 from tests.testing import AsyncSIOTestClient
 
 
@@ -38,6 +41,66 @@ async def test_successful_send(
     assert roomed_receiver.event_count() == 0
 
 
+@pytest.mark.anyio
+async def test_successful_send_binary(
+    roomed_sender: AsyncSIOTestClient,
+    roomed_receiver: AsyncSIOTestClient,
+    source_twex: Twex,
+    faker: Faker,
+) -> None:
+    await source_twex.update_status(TwexStatus.FULL)
+    chunk: bytes = faker.binary(length=24)
+
+    code_send, ack_send = await roomed_sender.emit(
+        "send", {"file_id": source_twex.file_id, "chunk": chunk}
+    )
+    assert code_send == 200
+    assert (chunk_id := ack_send.get("chunk_id")) is not None
+
+    event_send = roomed_receiver.event_pop("send")
+    assert isinstance(event_send, dict)
+    assert event_send.get("chunk") == chunk
+    assert event_send.get("chunk_id") == chunk_id
+    assert event_send.get("file_id") == source_twex.file_id
+
+    assert roomed_sender.event_count() == 0
+    assert roomed_receiver.event_count() == 0
+
+
+@pytest.mark.anyio
+async def test_send_no_subscribers(
+    roomed_sender: AsyncSIOTestClient,
+    receiver: AsyncSIOTestClient,
+    source_twex: Twex,
+    chunk: str,
+) -> None:
+    await source_twex.update_status(TwexStatus.FULL)
+
+    with patch.object(
+        PydanticPackager,
+        "pack_to_any",
+        autospec=True,
+        side_effect=PydanticPackager.pack_to_any,
+    ) as pack_mock:
+        code_send, ack_send = await roomed_sender.emit(
+            "send", {"file_id": source_twex.file_id, "chunk": chunk}
+        )
+    assert code_send == 200
+    assert ack_send.get("chunk_id") is not None
+
+    # only the ack is packed (by the AckPacker subclass), the event is skipped
+    assert all(
+        type(call.args[0]) is not PydanticPackager for call in pack_mock.call_args_list
+    )
+    assert pack_mock.call_count == 1
+
+    result_twex = await Twex.find_one(source_twex.file_id)
+    assert result_twex.status == TwexStatus.SENT
+
+    assert roomed_sender.event_count() == 0
+    assert receiver.event_count() == 0
+
+
 @pytest.mark.anyio
 @pytest.mark.parametrize(
     ("data", "code"),
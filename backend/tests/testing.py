@@ -1,10 +1,15 @@
 import logging
-from collections.abc import AsyncIterator, Iterator
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
 from contextlib import asynccontextmanager, contextmanager
 from typing import Any, Self
 from unittest.mock import patch
 
-from socketio import AsyncServer, packet  # type: ignore
+from socketio import AsyncNamespace, AsyncServer, packet  # type: ignore
+
+from siox.emitters import wait_background_emits
+from siox.parsers import RequestSignatureParser
+from siox.request import RequestData
+from siox.types import DataOrTuple
 
 
 class AsyncSIOTestClient:
@@ -13,6 +18,7 @@ class AsyncSIOTestClient:
         self.eio_sid: str = eio_sid
         self.events: dict[str, list[Any]] = {}
         self.packets: dict[int, list[packet.Packet]] = {}
+        self.pending_packet: packet.Packet | None = None  # waits for attachments
 
     @property
     def sid(self) -> str:
@@ -34,8 +40,30 @@ class AsyncSIOTestClient:
             return sum(len(queue) for queue in self.events.values())
         return len(self.events.get(event, []))
 
+    def packet_put(self, pkt: packet.Packet) -> None:
+        if pkt.packet_type == packet.EVENT or pkt.packet_type == packet.BINARY_EVENT:
+            self.event_put(event=pkt.data[0], data=pkt.data[1])
+        else:
+            logging.warning(f"Unknown packet: {pkt.packet_type=} {pkt.data=}")
+            self.packets.setdefault(pkt.packet_type, []).append(pkt)
+
+    def frame_put(self, frame: str | bytes) -> None:
+        # decodes frames the same way a client would, binary attachments included
+        if self.pending_packet is None:
+            pkt = packet.Packet(encoded_packet=frame)
+            if pkt.attachment_count != 0:
+                self.pending_packet = pkt
+                return
+        elif self.pending_packet.add_attachment(frame):
+            pkt, self.pending_packet = self.pending_packet, None
+        else:
+            return
+        self.packet_put(pkt)
+
     async def emit(self, event: str, *data: Any) -> Any:
-        return await self.server._trigger_event(event, "/", self.sid, *data)
+        result = await self.server._trigger_event(event, "/", self.sid, *data)
+        await wait_background_emits()
+        return result
 
 
 class AsyncSIOTestServer:
@@ -43,20 +71,16 @@ class AsyncSIOTestServer:
         self.server: AsyncServer = server
         self.clients: dict[str, AsyncSIOTestClient] = {}
 
-    async def _send_packet(self, eio_sid: str, pkt: packet.Packet) -> None:
+    async def _send_frame(self, eio_sid: str, frame: str | bytes) -> None:
         client: AsyncSIOTestClient | None = self.clients.get(eio_sid)
         if client is None:
             return  # TODO logging?
-
-        if pkt.packet_type == packet.EVENT or pkt.packet_type == packet.BINARY_EVENT:
-            client.event_put(event=pkt.data[0], data=pkt.data[1])
-        else:
-            logging.warning(f"Unknown packet: {pkt.packet_type=} {pkt.data=}")
-            client.packets.setdefault(pkt.packet_type, []).append(pkt)
+        client.frame_put(frame)
 
     @contextmanager
     def mock(self) -> Iterator[Self]:
-        mock_send = patch.object(self.server, "_send_packet", self._send_packet)
+        # frames are intercepted after encoding, to test what clients would get
+        mock_send = patch.object(self.server.eio, "send", self._send_frame)
         mock_send.start()
         yield self
         mock_send.stop()
@@ -78,3 +102,13 @@ class AsyncSIOTestServer:
         await self.server._handle_eio_disconnect(eio_sid=eio_sid)
 
         # TODO check client.packets for the DISCONNECT-type packet
+
+
+ClientsFactory = Callable[[int], Awaitable[list[AsyncSIOTestClient]]]
+
+
+async def handle(handler: Callable[..., Any], *arguments: Any) -> DataOrTuple:
+    client_handler = RequestSignatureParser(handler).extract()
+    return await client_handler.handle(
+        RequestData(AsyncNamespace("/"), "test", "sid", *arguments)
+    )
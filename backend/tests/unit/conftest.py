@@ -0,0 +1,30 @@
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AsyncExitStack
+
+import pytest
+from socketio import AsyncServer  # type: ignore
+
+from siox.managers import AsyncBroadcastManager
+from tests.testing import AsyncSIOTestClient, AsyncSIOTestServer, ClientsFactory
+
+
+@pytest.fixture()
+def broadcast_server() -> Iterator[AsyncSIOTestServer]:
+    sio = AsyncServer(async_mode="asgi", client_manager=AsyncBroadcastManager())
+    with AsyncSIOTestServer(server=sio).mock() as server:
+        yield server
+
+
+@pytest.fixture()
+async def connect_clients(
+    broadcast_server: AsyncSIOTestServer,
+) -> AsyncIterator[ClientsFactory]:
+    async with AsyncExitStack() as stack:
+
+        async def connect(count: int) -> list[AsyncSIOTestClient]:
+            return [
+                await stack.enter_async_context(broadcast_server.client())
+                for _ in range(count)
+            ]
+
+        yield connect
@@ -0,0 +1,111 @@
+from asyncio import create_task
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from socketio import packet  # type: ignore
+
+from tests.testing import AsyncSIOTestServer, ClientsFactory
+
+
+@pytest.mark.anyio
+async def test_packet_encoded_once(
+    broadcast_server: AsyncSIOTestServer,
+    connect_clients: ClientsFactory,
+) -> None:
+    clients = await connect_clients(3)
+
+    with patch.object(
+        packet.Packet, "encode", autospec=True, side_effect=packet.Packet.encode
+    ) as encode_mock:
+        await broadcast_server.server.emit("hello", {"a": 1})
+    assert encode_mock.call_count == 1
+
+    for client in clients:
+        assert client.event_pop("hello") == {"a": 1}
+        assert client.event_count() == 0
+
+
+@pytest.mark.anyio
+async def test_skip_sid_list(
+    broadcast_server: AsyncSIOTestServer,
+    connect_clients: ClientsFactory,
+) -> None:
+    skipped_1, skipped_2, client = await connect_clients(3)
+
+    await broadcast_server.server.emit(
+        "hello", "data", skip_sid=[skipped_1.sid, skipped_2.sid]
+    )
+
+    assert client.event_pop("hello") == "data"
+    assert client.event_count() == 0
+    assert skipped_1.event_count() == 0
+    assert skipped_2.event_count() == 0
+
+
+@pytest.mark.anyio
+async def test_callback_fallback(
+    broadcast_server: AsyncSIOTestServer,
+    connect_clients: ClientsFactory,
+) -> None:
+    clients = await connect_clients(2)
+
+    def callback(*_: Any) -> None:
+        pass
+
+    await broadcast_server.server.emit("hello", "data", callback=callback)
+
+    # ack ids are generated for every participant separately
+    manager = broadcast_server.server.manager
+    for client in clients:
+        assert client.event_pop("hello") == "data"
+        assert client.event_count() == 0
+        assert callback in manager.callbacks[client.sid].values()
+
+
+@pytest.mark.anyio
+async def test_binary_payload(
+    broadcast_server: AsyncSIOTestServer,
+    connect_clients: ClientsFactory,
+) -> None:
+    clients = await connect_clients(2)
+    data = {"chunk": b"\x00\x01binary", "file_id": "id"}
+
+    await broadcast_server.server.emit("hello", data)
+
+    for client in clients:
+        assert client.event_pop("hello") == data
+        assert client.event_count() == 0
+
+
+@pytest.mark.anyio
+async def test_big_fanout_yields(
+    broadcast_server: AsyncSIOTestServer,
+    connect_clients: ClientsFactory,
+) -> None:
+    manager = broadcast_server.server.manager
+    client_count = manager.batch_size * 2 + 1
+    await connect_clients(client_count)
+
+    other_task_ran = False
+
+    async def other_task() -> None:
+        nonlocal other_task_ran
+        other_task_ran = True
+
+    seen_by_sends: list[bool] = []
+    send_frame = broadcast_server._send_frame
+
+    async def send_frame_spy(eio_sid: str, frame: str | bytes) -> None:
+        seen_by_sends.append(other_task_ran)
+        await send_frame(eio_sid, frame)
+
+    with patch.object(broadcast_server.server.eio, "send", send_frame_spy):
+        task = create_task(other_task())
+        await broadcast_server.server.emit("hello", "data")
+        await task
+
+    assert len(seen_by_sends) == client_count
+    # the other task only runs when the fanout yields after the first batch
+    assert not any(seen_by_sends[: manager.batch_size])
+    assert all(seen_by_sends[manager.batch_size :])
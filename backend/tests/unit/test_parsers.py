@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Annotated
+
+import pytest
+
+from siox.markers import Depends
+from tests.testing import handle
+
+
+def constant(value: int) -> int:
+    return value
+
+
+class Two:
+    def __call__(self) -> int:
+        return 2
+
+
+make_three = partial(constant, 3)
+make_two = Two()
+
+
+async def handler(
+    three: Annotated[int, Depends(make_three)],
+    two: Annotated[int, Depends(make_two)],
+) -> tuple[int, int]:
+    return three, two
+
+
+@pytest.mark.anyio
+async def test_non_function_dependencies() -> None:
+    assert await handle(handler) == (3, 2)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from asyncio import sleep
+from collections.abc import AsyncIterator, Iterator
+from contextvars import ContextVar
+from typing import Annotated
+
+import pytest
+
+from siox.exceptions import EventException
+from siox.markers import Depends
+from tests.testing import handle
+
+log: list[str] = []
+
+
+@pytest.fixture(autouse=True)
+def clear_log() -> None:
+    log.clear()
+
+
+async def first() -> int:
+    log.append("first start")
+    await sleep(0)
+    log.append("first end")
+    return 1
+
+
+async def second() -> int:
+    log.append("second start")
+    await sleep(0)
+    log.append("second end")
+    return 2
+
+
+async def independent_handler(
+    first: Annotated[int, Depends(first)],
+    second: Annotated[int, Depends(second)],
+) -> int:
+    return first + second
+
+
+@pytest.mark.anyio
+async def test_layer_runs_concurrently() -> None:
+    assert await handle(independent_handler) == 3
+    assert log == ["first start", "second start", "first end", "second end"]
+
+
+async def failing() -> int:
+    log.append("failing")
+    raise EventException(404, "Not found")
+
+
+async def failing_handler(
+    first: Annotated[int, Depends(failing)],
+    second: Annotated[int, Depends(second)],
+) -> int:
+    raise NotImplementedError
+
+
+@pytest.mark.anyio
+async def test_layer_failure_waits_for_others() -> None:
+    assert await handle(failing_handler) == (
+        404,
+        {"reason": "Not found", "detail": None},
+    )
+    assert log == ["failing", "second start", "second end"]
+
+
+def sync_generator() -> Iterator[int]:
+    log.append("sync enter")
+    yield 1
+    log.append("sync exit")
+
+
+async def async_generator(
+    value: Annotated[int, Depends(sync_generator)],
+) -> AsyncIterator[int]:
+    log.append("async enter")
+    yield value + 1
+    log.append("async exit")
+
+
+async def generator_handler(
+    value: Annotated[int, Depends(async_generator)],
+) -> int:
+    log.append("handler")
+    return value
+
+
+@pytest.mark.anyio
+async def test_generators_exit_through_stack() -> None:
+    assert await handle(generator_handler) == 2
+    assert log == ["sync enter", "async enter", "handler", "async exit", "sync exit"]
+
+
+first_var: ContextVar[str] = ContextVar("first_var", default="unset")
+second_var: ContextVar[str] = ContextVar("second_var", default="unset")
+
+
+async def first_generator() -> AsyncIterator[None]:
+    token = first_var.set("first")
+    yield
+    first_var.reset(token)
+
+
+async def second_generator() -> AsyncIterator[None]:
+    token = second_var.set("second")
+    yield
+    second_var.reset(token)
+
+
+async def context_handler(
+    first: Annotated[None, Depends(first_generator)],
+    second: Annotated[None, Depends(second_generator)],
+) -> tuple[str, str]:
+    return first_var.get(), second_var.get()
+
+
+@pytest.mark.anyio
+async def test_generators_of_one_layer_share_task() -> None:
+    assert await handle(context_handler) == ("first", "second")
+    assert first_var.get() == "unset"
+    assert second_var.get() == "unset"
+
+
+async def cyclic_one(value: Annotated[int, Depends(cyclic_two)]) -> int:
+    return value
+
+
+async def cyclic_two(value: Annotated[int, Depends(cyclic_one)]) -> int:
+    return value
+
+
+async def cyclic_handler(value: Annotated[int, Depends(cyclic_one)]) -> int:
+    return value
+
+
+@pytest.mark.anyio
+async def test_cyclic_dependencies() -> None:
+    with pytest.raises(Exception, match="Dependencies can't be cyclic"):
+        await handle(cyclic_handler)